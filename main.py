@@ -1,25 +1,28 @@
 from __future__ import annotations
 import asyncio
+import itertools
+import re
 import uuid
-from pydantic import BaseModel
+from dataclasses import dataclass
 from agents import (
     Agent,
     Runner,
-    handoff,
     trace,
     TResponseInputItem,
     MessageOutputItem,
-    HandoffOutputItem,
     ItemHelpers,
+    ModelSettings,
 )
-from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
-from questionnaire import questionnaire  # Expected to be a dict: {domain: [questions, ...]}
+from questionnaire import flat_questionnaire  # Expected to be a tuple of (domain, question) pairs
 
 # -----------------------
 # Shared Context Model
 # -----------------------
 
-class RiskAssessmentContext(BaseModel):
+# Plain slotted dataclass: fields are only ever set by this module, so pydantic
+# validation buys nothing here. The agents SDK accepts any context type.
+@dataclass(slots=True)
+class RiskAssessmentContext:
     current_domain: str | None = None
     current_question: str | None = None
     user_response: str | None = None
@@ -28,63 +31,35 @@ class RiskAssessmentContext(BaseModel):
 # Agent Definitions
 # -----------------------
 
-# Main Controller: Orchestrates the conversation by delegating to specialized agents.
-main_controller = Agent[RiskAssessmentContext](
-    name="MainController",
-    instructions=f"""{RECOMMENDED_PROMPT_PREFIX}
-You are the Main Controller for a risk assessment chatbot. Your role is to coordinate the conversation.
-When a new question is to be asked, transfer control to the Question Agent.
-When a user answer is received that appears to be a clarification (for example, a question or a request for more details), 
-you will transfer control to the Clarification Agent.
-You will not hand over to the Clarification Agent until after the question has been asked and the user replies.
-After the Clarification Agent provides an explanation, re-ask the exact original question.
-Once a final answer is received (one that does not look like a clarification), record the answer and proceed to the next question.
-DO NOT CHANGE the current question in context at any point in the assessment.""",
-    handoffs=[],  # Set below.
-)
-
-# Question Agent: Outputs the current question verbatim.
-question_agent = Agent[RiskAssessmentContext](
-    name="QuestionAgent",
-    instructions=f"""{RECOMMENDED_PROMPT_PREFIX}
-You are the Question Agent. Your sole responsibility is to output exactly the current question stored in the context.
-Do not add, modify, or ask any additional questions. Simply output the exact text of the current question.
-WAIT for the user's answer; do not prompt or ask for clarification.
-After outputting the question, immediately transfer control back to the Main Controller.""",
-    handoffs=[handoff(agent=main_controller)]
-)
-
 # Clarification Agent: Provides a concise explanation of the current question.
 clarification_agent = Agent[RiskAssessmentContext](
     name="ClarificationAgent",
-    instructions=f"""{RECOMMENDED_PROMPT_PREFIX}
-You are the Clarification Agent. Using the user_response and the current_question from the context, provide a brief, clear explanation 
+    instructions="""You are the Clarification Agent. The user message gives the assessment question after "Clarify the question:"
+and the user's query about it after "User asked:". Provide a brief, clear explanation
 of what the question is asking so the user can respond appropriately.
 DO NOT RETURN or modify the current question – simply explain it in simple language.
-After providing your explanation, immediately transfer control back to the Main Controller.""",
-    handoffs=[handoff(agent=main_controller)]
+Keep the explanation to at most three short sentences.""",
+    # The agent has no handoffs, so the cap only limits the explanation text. A reply
+    # longer than 120 tokens is cut off, hence the length limit in the instructions.
+    model_settings=ModelSettings(temperature=0.2, top_p=0.9, max_tokens=120),
 )
 
-# Configure the Main Controller to hand off to the specialized agents.
-main_controller.handoffs = [
-    handoff(agent=question_agent),
-    handoff(agent=clarification_agent),
-]
-
 # -----------------------
 # Helper: Classify Answer
 # -----------------------
 
+# A leading question word as the first whitespace-delimited token.
+QUESTION_WORD_RE = re.compile(
+    r"\s*(?:what|why|how|when|where|which|who)(?:\s|$)",
+    re.IGNORECASE,
+)
+
 def classify_answer(answer: str) -> str:
     """
     Returns "clarification" if the answer appears to be a clarifying question,
     and "valid" otherwise.
     """
-    answer = answer.strip().lower()
-    question_words = {"what", "why", "how", "when", "where", "which", "who"}
-    if "?" in answer:
-        return "clarification"
-    if answer.split() and answer.split()[0] in question_words:
+    if "?" in answer or QUESTION_WORD_RE.match(answer):
         return "clarification"
     return "valid"
 
@@ -92,36 +67,21 @@ def classify_answer(answer: str) -> str:
 # Main Conversation Loop
 # -----------------------
 
-async def run_question(domain: str, question: str):
-    # Create a fresh context for this question.
-    context = RiskAssessmentContext(
-        current_domain=domain,
-        current_question=question,
-        user_response=None,
-    )
-    conversation_id = uuid.uuid4().hex[:16]
-    current_agent = main_controller
+# Trace group ids only need to be unique per run: a random per-process prefix
+# plus a counter avoids a uuid4()/urandom call for every question.
+RUN_ID = uuid.uuid4().hex[:8]
+conversation_counter = itertools.count()
+
+async def run_question(context: RiskAssessmentContext, domain: str, question: str):
+    # Questions arrive already stripped from flat_questionnaire.
+    # Reset the shared context for this question rather than building a new model.
+    context.current_domain = domain
+    context.current_question = question
+    context.user_response = None
+    conversation_id = f"{RUN_ID}{next(conversation_counter):08x}"
 
-    # Step 1: Ask the question using the Question Agent.
-    # Use a fresh input with only the system message.
-    input_items = [{"content": context.current_question, "role": "system"}]
-    with trace("Risk Assessment", group_id=conversation_id):
-        result = await Runner.run(main_controller, input_items, context=context)
-    # Extract the output; if it doesn't match exactly the current question, override it.
-    asked_question = ""
-    for item in result.new_items:
-        if isinstance(item, MessageOutputItem):
-            asked_question = ItemHelpers.text_message_output(item).strip()
-            break
-    if asked_question != context.current_question.strip():
-        # Override any extra output with the original question.
-        asked_question = context.current_question.strip()
-    print("Question:", asked_question)
-    for item in result.new_items:
-        if isinstance(item, HandoffOutputItem):
-            print(f"Handoff: {item.source_agent.name} -> {item.target_agent.name}")
-    # Ensure control returns to Main Controller.
-    current_agent = result.last_agent
+    # Step 1: Ask the question. It is printed verbatim here rather than echoed by an agent.
+    print("Question:", question)
 
     # Step 2: Wait for the user's answer.
     user_ans = input("Your answer: ").strip()
@@ -130,29 +90,16 @@ async def run_question(domain: str, question: str):
 
     # Loop until a valid answer is received.
     while classification == "clarification":
-        # Step 3: Trigger the Clarification Agent.
-        clar_prompt = f"Clarify the question: {context.current_question}\nUser asked: {user_ans}"
+        # Step 3: Run the Clarification Agent directly.
+        clar_prompt = f"Clarify the question: {question}\nUser asked: {user_ans}"
         input_items = [{"content": clar_prompt, "role": "user"}]
         with trace("Risk Assessment", group_id=conversation_id):
-            result = await Runner.run(main_controller, input_items, context=context)
+            result = await Runner.run(clarification_agent, input_items, context=context)
         for item in result.new_items:
             if isinstance(item, MessageOutputItem):
                 print("Clarification:", ItemHelpers.text_message_output(item))
-            elif isinstance(item, HandoffOutputItem):
-                print(f"Handoff: {item.source_agent.name} -> {item.target_agent.name}")
         # Step 4: Re-ask the original question exactly.
-        input_items = [{"content": context.current_question, "role": "system"}]
-        with trace("Risk Assessment", group_id=conversation_id):
-            result = await Runner.run(main_controller, input_items, context=context)
-        for item in result.new_items:
-            if isinstance(item, MessageOutputItem):
-                # Again, override any deviation.
-                asked_question = ItemHelpers.text_message_output(item).strip()
-                if asked_question != context.current_question.strip():
-                    asked_question = context.current_question.strip()
-                print("Question re-asked:", asked_question)
-            elif isinstance(item, HandoffOutputItem):
-                print(f"Handoff: {item.source_agent.name} -> {item.target_agent.name}")
+        print("Question re-asked:", question)
         # Step 5: Get a new answer.
         user_ans = input("Your answer after clarification: ").strip()
         context.user_response = user_ans
@@ -163,13 +110,10 @@ async def run_question(domain: str, question: str):
     print("Final answer for question:", context.current_question, "->", context.user_response)
 
 async def main():
-    # Flatten the questionnaire into a list of (domain, question) pairs.
-    questions_list = []
-    for domain, qs in questionnaire.items():
-        for q in qs:
-            questions_list.append((domain, q))
-    for domain, q in questions_list:
-        await run_question(domain, q)
+    # One context for the whole assessment; run_question resets its fields.
+    context = RiskAssessmentContext()
+    for domain, q in flat_questionnaire:
+        await run_question(context, domain, q)
         print()  # Blank line for readability.
 
 if __name__ == "__main__":
@@ -30,3 +30,8 @@ questionnaire = {
         "Updates: The organisation prioritises the implementation of critical or important updates for operating systems and applications (e.g., security patches) to be applied as soon as possible."
     ]
 }
+
+# Flattened (domain, question) pairs, built once at import for callers that walk every question.
+flat_questionnaire = tuple(
+    (domain, question.strip()) for domain, questions in questionnaire.items() for question in questions
+)